@@ -7,22 +7,33 @@ from fastapi.responses import HTMLResponse, RedirectResponse
 # Jinja2Templates is used for server-side rendering of HTML templates to produce dynamic content based on user data.
 from fastapi.templating import Jinja2Templates
 
+# FileSystemBytecodeCache persists compiled Jinja2 template bytecode across worker restarts.
+from jinja2 import FileSystemBytecodeCache
+
 # SQLAlchemy components for ORM (Object Relational Mapping) to facilitate interaction with the database without writing raw SQL queries.
-from sqlalchemy import create_engine, Column, Integer, String, Date, Time, ForeignKey
-from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker, relationship, Session
+from sqlalchemy import Column, Integer, String, Date, Time, ForeignKey, Index, UniqueConstraint, select, event, inspect, text
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
+from sqlalchemy.orm import declarative_base, relationship
 
 # datetime and time are used to manage and manipulate date and time objects for bookings.
 from datetime import datetime, time
 
+# lru_cache memoizes the small date/time parsing helpers, whose inputs repeat heavily
+# across bookings (a handful of dates and hourly slots).
+from functools import lru_cache
+
+# asynccontextmanager builds the lifespan hook that runs startup/shutdown work.
+from contextlib import asynccontextmanager
+
 # StaticFiles serves static files (CSS)
 from fastapi.staticfiles import StaticFiles
 
 # Authlib integrates OAuth authentication, in this case, Google's OAuth, with the FastAPI application.
 from authlib.integrations.starlette_client import OAuth
 
-# Config from Starlette allows for easy management of environment configurations.
-from starlette.config import Config
+# httpx provides the shared async HTTP client used for direct calls to Google endpoints.
+import httpx
 
 # SessionMiddleware is middleware to manage user sessions, allowing data persistence between different requests (login sessions).
 from starlette.middleware.sessions import SessionMiddleware
@@ -33,58 +44,129 @@ from dotenv import load_dotenv
 # os library to access the system's environment variables, which include OAuth keys and secret keys.
 import os
 
+# hashlib is used to derive a stable, non-reversible cache key from the OAuth access token.
+import hashlib
+
+# TTLCache provides a small in-process cache with automatic expiry, used to avoid repeated userinfo lookups.
+from cachetools import TTLCache
+
 # logging module is used for logging information, warnings, and error messages for better debugging and tracking application flow.
 import logging
 
 # Load environment variables from the .env file to manage credentials safely.
+# Only SECRET_KEY is read at import time, because SessionMiddleware below is
+# constructed together with the app; the Google OAuth credentials are read in
+# the lifespan hook so importing this module (e.g. from tests) stays cheap.
 load_dotenv()
-
-# Get environment variables related to Google OAuth and application security.
-CLIENT_ID = os.getenv('GOOGLE_CLIENT_ID')  
-CLIENT_SECRET = os.getenv('GOOGLE_CLIENT_SECRET') 
-SECRET_KEY = os.getenv('SECRET_KEY')  
+SECRET_KEY = os.getenv('SECRET_KEY')
 
 # Configure logging settings to log information. This helps in debugging and tracking issues.
 logging.basicConfig(level=logging.INFO)
 
-app = FastAPI()
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Run one-time startup and shutdown work for the application.
 
+    On startup: read the Google OAuth credentials from the environment,
+    register the Google client with Authlib, and create any missing
+    database tables. On shutdown: close the shared HTTP client.
+    """
+    client_id = os.getenv('GOOGLE_CLIENT_ID')
+    client_secret = os.getenv('GOOGLE_CLIENT_SECRET')
+    # Registering via the OIDC discovery document lets Authlib fetch Google's
+    # endpoint metadata and JWKS once and cache them on the client, so each
+    # login verifies the id_token locally against the cached keys instead of
+    # calling the userinfo endpoint.
+    oauth.register(
+        name='google',
+        client_id=client_id,
+        client_secret=client_secret,
+        server_metadata_url='https://accounts.google.com/.well-known/openid-configuration',
+        client_kwargs={'scope': 'openid email profile'},
+        redirect_uri='http://127.0.0.1:8000/auth',
+    )
+    async with engine.begin() as conn:
+        await conn.run_sync(create_missing_tables)
+    yield
+    await http_client.aclose()
+
+app = FastAPI(lifespan=lifespan)
+
+# Middleware policy: any custom middleware added to this stack must be written as
+# pure ASGI (`async def __call__(self, scope, receive, send)`), never by subclassing
+# starlette.middleware.base.BaseHTTPMiddleware, which adds significant latency and
+# can produce Content-Length mismatches on streamed responses. Per-request state
+# (e.g. a database session) should be attached to scope["state"] and cleaned up
+# after the final response message is sent. SessionMiddleware below is pure ASGI.
 app.add_middleware(SessionMiddleware, secret_key=SECRET_KEY)
 
+class CacheControlStaticFiles(StaticFiles):
+    """
+    StaticFiles that marks every response as publicly cacheable for a day,
+    so browsers, reverse proxies, and CDNs can serve the CSS without
+    hitting the application again.
+    """
+    def file_response(self, *args, **kwargs):
+        response = super().file_response(*args, **kwargs)
+        response.headers.setdefault("Cache-Control", "public, max-age=86400")
+        return response
+
 # Mount static files for the application, enabling serving of static content (CSS)
-app.mount("/static", StaticFiles(directory="static"), name="static")
+app.mount("/static", CacheControlStaticFiles(directory="static"), name="static")
 
 # Configure Jinja2Templates for server-side HTML rendering using templates stored in the "templates" directory.
 templates = Jinja2Templates(directory="templates")
 
-# OAuth configuration for integrating with Google, setting up credentials to authenticate with Google's OAuth service.
-config_data = {
-    'GOOGLE_CLIENT_ID': CLIENT_ID,
-    'GOOGLE_CLIENT_SECRET': CLIENT_SECRET,
-}
-config = Config(environ=config_data)  
-oauth = OAuth(config)  # Create an OAuth instance for managing authentication.
-
-# Register Google OAuth with all necessary endpoints and configuration.
-oauth.register(
-    name='google',  
-    client_id=CLIENT_ID, 
-    client_secret=CLIENT_SECRET,  
-    authorize_url='https://accounts.google.com/o/oauth2/auth',  # URL to authorize the user.
-    access_token_url='https://accounts.google.com/o/oauth2/token',  # URL to obtain the access token.
-    userinfo_endpoint='https://openidconnect.googleapis.com/v1/userinfo',  # URL to get user information.
-    client_kwargs={'scope': 'openid email profile'},  
-    redirect_uri='http://127.0.0.1:8000/auth', 
-)
-
-ALLOWED_EMAILS = [
+# Persist compiled template bytecode on disk so a worker restart reuses it instead of
+# re-parsing the template sources, trimming cold-start latency. Templates are not
+# edited in production, so auto_reload's per-render mtime checks are disabled too.
+JINJA_BYTECODE_CACHE_DIR = "/tmp/jinja_cache"
+os.makedirs(JINJA_BYTECODE_CACHE_DIR, exist_ok=True)
+templates.env.bytecode_cache = FileSystemBytecodeCache(JINJA_BYTECODE_CACHE_DIR)
+templates.env.auto_reload = False
+
+# OAuth registry for integrating with Google; the Google client itself is
+# registered in the lifespan hook once credentials have been loaded.
+oauth = OAuth()
+
+# Shared HTTP client for the application's own calls to Google. Reusing one client
+# keeps TCP/TLS connections pooled across requests instead of paying a fresh
+# handshake per call; it is closed once at application shutdown.
+GOOGLE_USERINFO_ENDPOINT = 'https://openidconnect.googleapis.com/v1/userinfo'
+http_client = httpx.AsyncClient(timeout=10.0)
+
+# Allow-lists checked on every login. The emails live in a frozenset for O(1)
+# membership tests, and the domain suffixes in a tuple so they can be passed
+# straight to str.endswith, which accepts a tuple of suffixes natively.
+ALLOWED_EMAILS = frozenset({
     'sias.runclub@krea.edu.in',
     'sias.esok@krea.ac.in',
-    'sias.finearts@krea.ac.in'
-]
-ALLOWED_DOMAINS = [
+    'sias.finearts@krea.ac.in',
+})
+ALLOWED_DOMAINS = (
     'sias22@krea.ac.in',
-]
+)
+
+# In-process cache of validated user info, keyed by a hash of the OAuth access token.
+# Repeated callbacks with the same token reuse the cached claims instead of making
+# another round-trip to Google's userinfo endpoint. Entries expire after at most
+# USERINFO_CACHE_TTL seconds, or earlier if the token itself expires first.
+USERINFO_CACHE_TTL = 300
+userinfo_cache = TTLCache(maxsize=10_000, ttl=USERINFO_CACHE_TTL)
+
+def get_userinfo_cache_key(token: dict) -> str:
+    """
+    Derive the cache key for a token's user info from its access token.
+    The raw access token is hashed so it is never stored directly in the cache.
+
+    Parameters:
+    token (dict): The OAuth token response from Google.
+
+    Returns:
+    str: A hex-encoded SHA-256 digest of the access token.
+    """
+    return hashlib.sha256(token['access_token'].encode()).hexdigest()
 
 # Define routes for the FastAPI application.
 
@@ -141,15 +223,43 @@ async def auth(request: Request):
             return HTMLResponse(content="Failed to receive token from Google", status_code=400)
 
         logging.info(f"Token received: {token}")
-        user = await oauth.google.userinfo(token=token)  # Get user information.
+        cache_key = get_userinfo_cache_key(token)
+
+        # Reuse cached user info for this token if present and the token has not expired.
+        user = None
+        cached = userinfo_cache.get(cache_key)
+        if cached is not None:
+            cached_user, expires_at = cached
+            if expires_at is None or expires_at > datetime.now().timestamp():
+                user = cached_user
+            else:
+                userinfo_cache.pop(cache_key, None)
+
+        if user is None:
+            # Prefer the id_token claims that authorize_access_token already verified
+            # and parsed; this avoids a separate HTTP round-trip to the userinfo endpoint.
+            # authorize_access_token verifies the id_token against Google's
+            # cached JWKS and exposes the claims directly; the userinfo RPC
+            # below is only a fallback for token responses without an id_token.
+            user = token.get('userinfo')
+            if not user:
+                logging.warning("Token response carried no id_token claims; falling back to the userinfo endpoint.")
+                response = await http_client.get(
+                    GOOGLE_USERINFO_ENDPOINT,
+                    headers={'Authorization': f"Bearer {token['access_token']}"},
+                )
+                response.raise_for_status()
+                user = response.json()
+            if user:
+                user = dict(user)
+                userinfo_cache[cache_key] = (user, token.get('expires_at'))
+
         if user:
             user_email = user['email']
             # Check if the user's email is in the allowed domains or email list.
-            if (
-                any(user_email.endswith(domain) for domain in ALLOWED_DOMAINS) or
-                user_email in ALLOWED_EMAILS
-            ):
+            if user_email.endswith(ALLOWED_DOMAINS) or user_email in ALLOWED_EMAILS:
                 request.session['user'] = dict(user)  # Save the user information in the session.
+                request.session['userinfo_cache_key'] = cache_key  # Remembered so logout can invalidate the cache.
                 return RedirectResponse(url='/bookings')  
             else:
                 logging.warning(f"Unauthorized email domain attempted login: {user_email}")
@@ -173,13 +283,45 @@ async def logout(request: Request):
     RedirectResponse: Redirects to the homepage after logout.
     """
     request.session.pop('user', None)  # Remove user from the session.
+    cache_key = request.session.pop('userinfo_cache_key', None)
+    if cache_key:
+        userinfo_cache.pop(cache_key, None)  # Invalidate the cached user info for this token.
     return RedirectResponse(url='/')
 
 # Database setup
 # Create the database engine and session.
-DATABASE_URL = "sqlite:///./club_bookings.db"  
-engine = create_engine(DATABASE_URL)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+DATABASE_URL = "sqlite+aiosqlite:///./club_bookings.db"
+# Size the connection pool explicitly so concurrent requests do not exhaust it,
+# recycle stale connections, and ping before checkout to drop dead ones. The
+# async engine lets booking handlers await queries on the event loop instead of
+# tying up a threadpool worker per request.
+engine = create_async_engine(
+    DATABASE_URL,
+    pool_size=20,
+    max_overflow=10,
+    pool_pre_ping=True,
+    pool_recycle=3600,
+)
+SessionLocal = async_sessionmaker(engine, autoflush=False, expire_on_commit=False)
+
+@event.listens_for(engine.sync_engine, "connect")
+def set_sqlite_pragmas(dbapi_connection, connection_record):
+    """
+    Apply per-connection SQLite pragmas when the pool opens a new connection.
+
+    WAL journaling lets readers proceed while a writer commits (checks of
+    existing bookings no longer block behind booking inserts), NORMAL
+    synchronous is safe under WAL and skips an fsync per commit, and the
+    busy timeout makes writers wait for a lock instead of failing
+    immediately with "database is locked".
+    """
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute("PRAGMA busy_timeout=5000")
+    cursor.execute("PRAGMA cache_size=-64000")  # 64 MB page cache.
+    cursor.execute("PRAGMA temp_store=MEMORY")
+    cursor.close()
 
 # Base class for all database models.
 Base = declarative_base()
@@ -197,34 +339,63 @@ class Space(Base):
 
 class Booking(Base):
     __tablename__ = "bookings"
-    booking_id = Column(Integer, primary_key=True, index=True)  
+    # Composite index covering the overlap check in check_existing_booking, which
+    # always filters on space and date before comparing times; without it SQLite
+    # scans the whole table on every booking POST.
+    # The unique constraint is the last line of defence against double booking:
+    # two concurrent requests can both pass check_existing_booking before either
+    # commits, but only one insert for a given space/date/slot can succeed. All
+    # bookings are one-hour slots, so identical start times cover that race.
+    __table_args__ = (
+        Index('ix_bookings_space_date', 'space_id', 'booking_date'),
+        UniqueConstraint('space_id', 'booking_date', 'start_time', name='uq_bookings_space_date_start'),
+    )
+    booking_id = Column(Integer, primary_key=True, index=True)
     club_id = Column(Integer, ForeignKey("clubs.club_id"))  # Foreign key linking to a club.
     space_id = Column(Integer, ForeignKey("spaces.space_id"))  # Foreign key linking to a space.
     booking_date = Column(Date)  
     start_time = Column(Time)  
     end_time = Column(Time)  
 
-    # Define relationships to access related Club and Space data.
-    club = relationship("Club")
-    space = relationship("Space")
+    # Define relationships to access related Club and Space data. Both use
+    # "selectin" loading so that any query returning bookings fetches the related
+    # clubs and spaces in one batched SELECT each, instead of issuing a separate
+    # lazy-load query per booking row (the classic N+1 pattern).
+    club = relationship("Club", lazy="selectin")
+    space = relationship("Space", lazy="selectin")
+
+# Table creation happens in the lifespan hook above; the async engine cannot
+# execute DDL at import time.
+def create_missing_tables(sync_conn):
+    """
+    Create any tables missing from the database, inside the caller's transaction.
 
-# Create all the defined tables in the SQLite database.
-Base.metadata.create_all(bind=engine)
+    One listing of the existing table names decides whether DDL is needed at
+    all; on the common warm start where every table already exists, this skips
+    create_all's per-table existence probes entirely.
 
-# Utility functions 
-def get_db():
+    Parameters:
+    sync_conn (Connection): The synchronous connection provided by run_sync.
     """
-    Creates a new database session for each request, providing thread-safe access.
-    
+    existing = set(inspect(sync_conn).get_table_names())
+    if not set(Base.metadata.tables) <= existing:
+        Base.metadata.create_all(sync_conn)
+
+# Utility functions
+async def get_db():
+    """
+    Creates a new database session for each request, providing safe concurrent access.
+
     Yields:
-    db (Session): A database session for interacting with the database.
+    db (AsyncSession): A database session for interacting with the database.
     """
     db = SessionLocal()
     try:
         yield db
     finally:
-        db.close()
+        await db.close()
 
+@lru_cache(maxsize=256)
 def get_end_hour_from_start_hour(start_hour: int) -> int:
     """
     Calculate the end hour for a booking based on the start hour.
@@ -238,6 +409,7 @@ def get_end_hour_from_start_hour(start_hour: int) -> int:
     """
     return start_hour + 1 if start_hour < 23 else 0
 
+@lru_cache(maxsize=256)
 def get_end_time_from_end_hour(end_hour: int) -> str:
     """
     Format the end hour as a time string in 'HH:00' format.
@@ -250,6 +422,7 @@ def get_end_time_from_end_hour(end_hour: int) -> str:
     """
     return f"{end_hour:02d}:00"
 
+@lru_cache(maxsize=256)
 def get_date_object_from_string(booking_date: str) -> datetime.date:
     """
     Convert a date string in 'YYYY-MM-DD' format to a datetime.date object.
@@ -262,6 +435,7 @@ def get_date_object_from_string(booking_date: str) -> datetime.date:
     """
     return datetime.strptime(booking_date, "%Y-%m-%d").date()
 
+@lru_cache(maxsize=256)
 def get_time_object_from_string(time_string: str) -> time:
     """
     Convert a time string in 'HH:MM' format to a datetime.time object.
@@ -274,24 +448,36 @@ def get_time_object_from_string(time_string: str) -> time:
     """
     return time(int(time_string.split(':')[0]), int(time_string.split(':')[1]))
 
-def verify_club_exists(club_name: str, db: Session):
+async def verify_club_exists(club_name: str, db: AsyncSession):
     """
     Verify if a club exists in the database based on the given club name.
     Raises an HTTPException if the club is not found.
 
     Parameters:
     club_name (str): The name of the club to be verified.
-    db (Session): The current database session.
+    db (AsyncSession): The current database session.
 
     Returns:
     Club: The club object if found.
     """
-    club = db.query(Club).filter(Club.club_name == club_name).first()
+    result = await db.execute(select(Club).filter(Club.club_name == club_name))
+    club = result.scalars().first()
     if not club:
         raise HTTPException(status_code=400, detail="Club not found.")
     return club
 
-def check_existing_booking(space_id: int, booking_date: datetime.date, start_time: time, end_time: time, db: Session):
+# Prepared once at import; every booking POST runs this statement, so the hot
+# path skips ORM statement construction and compilation entirely. Two intervals
+# [a, b) and [c, d) overlap exactly when a < d and b > c, and only existence
+# matters, so SELECT 1 with LIMIT 1 stops at the first conflicting row.
+OVERLAP_CHECK_SQL = text(
+    "SELECT 1 FROM bookings"
+    " WHERE space_id = :space_id AND booking_date = :booking_date"
+    " AND start_time < :end_time AND end_time > :start_time"
+    " LIMIT 1"
+)
+
+async def check_existing_booking(space_id: int, booking_date: datetime.date, start_time: time, end_time: time, db: AsyncSession):
     """
     Check if a booking already exists for a given space, date, and time slot combination.
     Ensures no overlapping bookings for the same space.
@@ -301,18 +487,22 @@ def check_existing_booking(space_id: int, booking_date: datetime.date, start_tim
     booking_date (datetime.date): The date of the booking.
     start_time (time): The start time of the booking.
     end_time (time): The end time of the booking.
-    db (Session): The current database session.
+    db (AsyncSession): The current database session.
 
     Returns:
-    Booking: The existing booking if found, otherwise None.
+    bool: True if a conflicting booking exists, otherwise False.
     """
-    return db.query(Booking).filter(
-        Booking.space_id == space_id,
-        Booking.booking_date == booking_date,
-        ((Booking.start_time <= start_time) & (Booking.end_time > start_time)) |
-        ((Booking.start_time < end_time) & (Booking.end_time >= end_time)) |
-        ((Booking.start_time >= start_time) & (Booking.end_time <= end_time))
-    ).first()
+    # text() bypasses the ORM's type coercion, so the parameters are formatted
+    # exactly as SQLAlchemy's SQLite dialect stores Date ('YYYY-MM-DD') and
+    # Time ('HH:MM:SS.ffffff') columns; the comparisons then behave as plain
+    # string comparisons with the same ordering as the typed columns.
+    result = await db.execute(OVERLAP_CHECK_SQL, {
+        "space_id": space_id,
+        "booking_date": booking_date.isoformat(),
+        "start_time": start_time.strftime("%H:%M:%S.%f"),
+        "end_time": end_time.strftime("%H:%M:%S.%f"),
+    })
+    return result.scalar() is not None
 
 @app.get("/bookings", response_class=HTMLResponse)
 async def bookings_page(request: Request):
@@ -329,25 +519,31 @@ async def bookings_page(request: Request):
     user = request.session.get('user')  # Get user from session.
     if not user:
         return RedirectResponse(url='/')  # Redirect to homepage if not logged in.
-    return templates.TemplateResponse("booking_form.html", {"request": request, "user_email": user['email']})
+    # The page is personalised with the user's email, so it may only be cached
+    # privately (in the user's own browser), never by a shared proxy or CDN.
+    return templates.TemplateResponse(
+        "booking_form.html",
+        {"request": request, "user_email": user['email']},
+        headers={"Cache-Control": "private, max-age=60"},
+    )
 
 @app.post("/bookings/")
-def create_booking(
+async def create_booking(
     club_name: str = Form(...),
     space_id: int = Form(...),
     booking_date: str = Form(...),
     start_time: str = Form(...),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Create a new booking for a club space, ensuring no overlapping bookings for the selected time and space.
-    
+
     Parameters:
     club_name (str): Name of the club making the booking.
     space_id (int): ID of the space to be booked.
     booking_date (str): The date for the booking in 'YYYY-MM-DD' format.
     start_time (str): The start time for the booking in 'HH:MM' format.
-    db (Session): The current database session (injected by FastAPI via Depends).
+    db (AsyncSession): The current database session (injected by FastAPI via Depends).
 
     Returns:
     dict: Success message and booking ID if the booking is created successfully.
@@ -356,7 +552,7 @@ def create_booking(
     HTTPException: If the club is not found or the time slot is already booked.
     """
     # Verify if the club exists in the database.
-    club = verify_club_exists(club_name, db)
+    club = await verify_club_exists(club_name, db)
 
     # Calculate the end time for the booking.
     start_hour, start_minute = map(int, start_time.split(':'))
@@ -369,7 +565,7 @@ def create_booking(
     end_time_obj = get_time_object_from_string(end_time)
 
     # Check if a booking already exists for the selected space, date, and time slot.
-    existing_booking = check_existing_booking(space_id, booking_date_obj, start_time_obj, end_time_obj, db)
+    existing_booking = await check_existing_booking(space_id, booking_date_obj, start_time_obj, end_time_obj, db)
     if existing_booking:
         raise HTTPException(status_code=400, detail="This time slot is already booked for the selected space.")
 
@@ -382,6 +578,20 @@ def create_booking(
         end_time=end_time_obj
     )
     db.add(new_booking)  # Add the new booking to the session.
-    db.commit()  # Commit the session to persist the changes.
-    db.refresh(new_booking)  # Refresh the booking instance to get the latest state.
+    try:
+        await db.commit()  # Commit the session to persist the changes.
+    except IntegrityError:
+        # A concurrent request claimed the same slot between our overlap check
+        # and this commit; the unique constraint on (space, date, start) wins.
+        await db.rollback()
+        raise HTTPException(status_code=400, detail="This time slot is already booked for the selected space.")
+    await db.refresh(new_booking)  # Refresh the booking instance to get the latest state.
     return {"message": "Booking successful!", "booking_id": new_booking.booking_id}
+
+if __name__ == "__main__":
+    # Production entry point: `python main.py` serves the app with uvloop as the
+    # event loop and httptools as the HTTP parser, both measurably faster than the
+    # pure-Python defaults. For development with auto-reload, keep using
+    # `uvicorn main:app --reload`.
+    import uvicorn
+    uvicorn.run("main:app", host="127.0.0.1", port=8000, loop="uvloop", http="httptools")
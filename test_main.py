@@ -1,9 +1,16 @@
 import pytest
-from datetime import time, datetime
+from datetime import date, time, datetime
+from sqlalchemy import create_engine, select
+from sqlalchemy.exc import InvalidRequestError
+from sqlalchemy.orm import Session, raiseload
 from main import (
-    get_end_hour_from_start_hour, 
-    get_end_time_from_end_hour, 
-    get_date_object_from_string, 
+    Base,
+    Booking,
+    Club,
+    Space,
+    get_end_hour_from_start_hour,
+    get_end_time_from_end_hour,
+    get_date_object_from_string,
     get_time_object_from_string
 )
 
@@ -21,3 +28,37 @@ def test_get_date_object_from_string():
 def test_get_time_object_from_string():
     assert get_time_object_from_string("13:45") == time(13, 45)
 
+def test_booking_relationships_do_not_lazy_load():
+    # Guardrail against N+1 regressions: Booking.club and Booking.space must be
+    # eagerly loaded (selectin) by every bookings query. raiseload("*") turns any
+    # lazy relationship load into an error, so if someone downgrades the mapper
+    # config, accessing the relationships here starts failing.
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    with Session(engine) as session:
+        club = Club(club_name="Run Club")
+        space = Space(space_name="SH1")
+        session.add_all([club, space])
+        session.flush()
+        session.add(Booking(
+            club_id=club.club_id,
+            space_id=space.space_id,
+            booking_date=date(2024, 10, 1),
+            start_time=time(16, 0),
+            end_time=time(17, 0),
+        ))
+        session.commit()
+
+    # Default loading: relationships resolve without any lazy loads.
+    with Session(engine) as session:
+        booking = session.execute(select(Booking)).scalars().first()
+        assert booking.club.club_name == "Run Club"
+        assert booking.space.space_name == "SH1"
+
+    # With raiseload("*") suppressing all relationship loading, attribute access
+    # must raise rather than silently issue a per-row query.
+    with Session(engine) as session:
+        booking = session.execute(select(Booking).options(raiseload("*"))).scalars().first()
+        with pytest.raises(InvalidRequestError):
+            booking.club
+